@@ -0,0 +1,262 @@
+# mine_generator/batch.py
+"""
+Batch dataset generation without Blender.
+
+Generates one scenario for every combination of seed and parameter sweep
+value in parallel worker processes, and writes sharded outputs:
+
+  OUT_DIR/manifest.json        run specification (checked on resume)
+  OUT_DIR/shard_00000.npz      ids (n,), heights (n, R, R) float32,
+                               masks (n, R, R) uint8 of terrain.FEATURE_* bits
+  OUT_DIR/index.jsonl          one metadata record per finished scenario
+
+Re-running the same command resumes an interrupted run: shards whose
+scenarios are all in the index are skipped.
+
+Example:
+  python -m mine_generator.batch out/ --seeds 0:1000 \\
+      --sweep MAX_DEPTH=40:90:10 --sweep ROAD_WIDTH=10,14 --set RESOLUTION=128
+"""
+import argparse
+import ast
+import importlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from . import config as cfg
+from . import pit_generator
+from . import road_network
+from . import dump_generator
+from . import plateau_generator
+from . import terrain
+
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.jsonl"
+
+FEATURE_NAMES = {
+    "pit": terrain.FEATURE_PIT,
+    "dump": terrain.FEATURE_DUMP,
+    "plateau": terrain.FEATURE_PLATEAU,
+    "road": terrain.FEATURE_ROAD,
+}
+
+# ---------------------- ARGUMENT PARSING ----------------------
+
+def _parse_value(text):
+    """Parses a parameter value as a Python literal, falling back to a string."""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+def _parse_range(text):
+    """Parses 'start:stop[:step]' (stop exclusive, like range) or 'a,b,c'."""
+    if ":" not in text:
+        return [_parse_value(v) for v in text.split(",") if v.strip()]
+    parts = [_parse_value(p) for p in text.split(":")]
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Bad range '{text}' (expected start:stop[:step])")
+    start, stop = parts[0], parts[1]
+    step = parts[2] if len(parts) == 3 else 1
+    if all(isinstance(v, int) for v in (start, stop, step)):
+        return list(range(start, stop, step))
+    count = max(0, int(math.ceil((stop - start) / float(step) - 1e-9)))
+    return [round(start + i * step, 10) for i in range(count)]
+
+def _parse_assignment(text):
+    name, sep, value = text.partition("=")
+    if not sep or not name:
+        raise ValueError(f"Expected NAME=VALUE, got '{text}'")
+    return name.strip(), value.strip()
+
+def build_scenarios(seeds, sweeps):
+    """Enumerates every (seed, sweep combination) as a numbered scenario."""
+    names = sorted(sweeps)
+    combos = list(itertools.product(*(sweeps[n] for n in names)))
+    scenarios = []
+    for seed in seeds:
+        for combo in combos:
+            scenarios.append({"id": len(scenarios), "seed": seed, "params": dict(zip(names, combo))})
+    return scenarios
+
+# ---------------------- WORKER ----------------------
+
+def generate_scenario(seed, overrides):
+    """
+    Reconfigures the generator for one scenario and returns its HeightField
+    and feature mask. Reloads the modules holding seed- and grid-dependent
+    state, so it is meant to run in a dedicated worker process.
+    """
+    cfg.configure(seed, **overrides)
+    for module in (pit_generator, road_network, dump_generator, plateau_generator, terrain):
+        importlib.reload(module)
+
+    features = np.zeros((cfg.RESOLUTION, cfg.RESOLUTION), dtype=np.uint8)
+    hf = terrain.generate_heightfield(verbose=False, features=features)
+    return hf, features
+
+def _shard_path(out_dir, shard_idx):
+    return os.path.join(out_dir, f"shard_{shard_idx:05d}.npz")
+
+def _generate_shard(task):
+    """Worker entry point: generates and writes one shard, returning its index records."""
+    shard_idx, scenarios, fixed, out_dir = task
+    heights, masks, records = [], [], []
+    for offset, sc in enumerate(scenarios):
+        start = time.perf_counter()
+        params = dict(fixed, **sc["params"])
+        hf, features = generate_scenario(sc["seed"], params)
+        heights.append(hf.z)
+        masks.append(features)
+        records.append({
+            "id": sc["id"],
+            "seed": sc["seed"],
+            "params": sc["params"],
+            "shard": shard_idx,
+            "offset": offset,
+            "z_min": float(hf.z.min()),
+            "z_max": float(hf.z.max()),
+            "coverage": {name: float(np.count_nonzero(features & bit)) / features.size
+                         for name, bit in FEATURE_NAMES.items()},
+            "seconds": round(time.perf_counter() - start, 3),
+        })
+
+    path = _shard_path(out_dir, shard_idx)
+    tmp_path = path[:-len(".npz")] + ".tmp.npz"
+    np.savez_compressed(tmp_path, ids=np.array([sc["id"] for sc in scenarios], dtype=np.int64),
+                        heights=np.stack(heights), masks=np.stack(masks))
+    os.replace(tmp_path, path)
+    return shard_idx, records
+
+# ---------------------- RUNNER ----------------------
+
+def _load_index(out_dir):
+    """Reads finished records from the index, ignoring a torn last line."""
+    records = {}
+    path = os.path.join(out_dir, INDEX_NAME)
+    if not os.path.exists(path):
+        return records
+    with open(path) as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            records[rec["id"]] = rec
+    return records
+
+def _prepare_manifest(out_dir, manifest):
+    """Writes the manifest, or checks that a resumed run uses the same specification."""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path) as fh:
+            existing = json.load(fh)
+        if existing != manifest:
+            raise SystemExit(f"{path} describes a different run; use a new output directory.")
+        return
+    with open(path, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m{seconds % 60:02d}s"
+
+def _check_parameters(sweeps, fixed):
+    """Raises ValueError for sweeps or fixed values the run cannot apply."""
+    for name in list(sweeps) + list(fixed):
+        if name in ("NOISE_SEED", "WORKING_FACE_ANGLE") or not name.isupper() or not hasattr(cfg, name):
+            raise ValueError(f"'{name}' is not a tunable config parameter")
+    for name in ("RESOLUTION", "SIZE"):
+        if name in sweeps:
+            raise ValueError(f"{name} cannot be swept; every shard must share one grid (use --set)")
+
+def run(out_dir, seeds, sweeps=None, fixed=None, shard_size=32, workers=None):
+    """
+    Generates all scenarios that are not yet in the index of `out_dir`.
+    Raises ValueError for unknown or untunable parameter names before
+    anything is written.
+    """
+    sweeps = sweeps or {}
+    fixed = fixed or {}
+    _check_parameters(sweeps, fixed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {
+        "seeds": list(seeds),
+        "sweeps": sweeps,
+        "fixed": fixed,
+        "shard_size": shard_size,
+        "resolution": fixed.get("RESOLUTION", cfg.RESOLUTION),
+        "size": fixed.get("SIZE", cfg.SIZE),
+        "features": FEATURE_NAMES,
+    }
+    # Round-trip so that tuples etc. compare equal to a manifest read back from disk
+    manifest = json.loads(json.dumps(manifest))
+    _prepare_manifest(out_dir, manifest)
+
+    scenarios = build_scenarios(seeds, sweeps)
+    done = _load_index(out_dir)
+    tasks = []
+    for shard_idx in range(int(math.ceil(len(scenarios) / float(shard_size)))):
+        shard = scenarios[shard_idx * shard_size:(shard_idx + 1) * shard_size]
+        if all(sc["id"] in done for sc in shard) and os.path.exists(_shard_path(out_dir, shard_idx)):
+            continue
+        tasks.append((shard_idx, shard, fixed, out_dir))
+
+    remaining = sum(len(t[1]) for t in tasks)
+    print(f"{len(scenarios)} scenarios: {len(scenarios) - remaining} already done, "
+          f"{remaining} to generate in {len(tasks)} shards")
+    if not tasks:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    start = time.time()
+    generated = 0
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(min(workers, len(tasks))) as pool, open(os.path.join(out_dir, INDEX_NAME), "a") as index:
+        for shard_idx, records in pool.imap_unordered(_generate_shard, tasks):
+            index.write("".join(json.dumps(rec) + "\n" for rec in records))
+            index.flush()
+            os.fsync(index.fileno())
+
+            generated += len(records)
+            elapsed = time.time() - start
+            rate = generated / elapsed * 3600.0 if elapsed > 0 else 0.0
+            eta = (remaining - generated) / rate * 3600.0 if rate > 0 else 0.0
+            print(f"[{generated}/{remaining}] shard {shard_idx:05d} written, "
+                  f"{rate:.0f} scenarios/hour, ETA {_format_duration(eta)}")
+
+    elapsed = time.time() - start
+    print(f"Generated {generated} scenarios in {_format_duration(elapsed)} "
+          f"({generated / max(elapsed, 1e-9) * 3600.0:.0f} scenarios/hour)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a sharded multi-seed terrain dataset without Blender.")
+    parser.add_argument("out_dir", help="output directory (re-run with the same arguments to resume)")
+    parser.add_argument("--seeds", required=True, help="seed range start:stop[:step] or list a,b,c")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME=RANGE",
+                        help="sweep a config parameter over start:stop[:step] or a,b,c (repeatable)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="fix a config parameter for every scenario (repeatable)")
+    parser.add_argument("--shard-size", type=int, default=32, help="scenarios per output shard")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    try:
+        seeds = _parse_range(args.seeds)
+        sweeps = dict((name, _parse_range(value)) for name, value in map(_parse_assignment, args.sweep))
+        fixed = dict((name, _parse_value(value)) for name, value in map(_parse_assignment, args.set))
+        _check_parameters(sweeps, fixed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    run(args.out_dir, seeds, sweeps, fixed, shard_size=args.shard_size, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ BRANCH_ANGLE_SPREAD = math.radians(36)
 BRANCH_LENGTH_FACTOR = 0.40
 SECONDARY_RAMP_ARC = math.radians(24)
 SECONDARY_RAMP_LENGTH = 0.55
+ROAD_SAMPLE_SPACING = 1.0  # Distance between road centerline vertices
 
 # Bottom working pad
 BOTTOM_PAD_RADIUS = 30.0
@@ -45,6 +46,7 @@ NOISE_MED_AMPL = 0.6
 NOISE_HIGH_SCALE = 0.08
 NOISE_HIGH_AMPL = 0.18
 MICRO_AMPL = 0.12
+NOISE_BAND_LIMIT = True  # Fade out FBM octaves above the grid's Nyquist frequency
 
 # Radial boundary deformation params
 BOUNDARY_NOISE_SCALE = 0.95
@@ -94,13 +96,42 @@ SUBDIV_LEVELS = 1
 APPLY_VERTEX_COLORS = True
 
 # ---------------------- DERIVED & RANDOMIZED SETTINGS ----------------------
-if NOISE_SEED is None:
-    NOISE_SEED = random.randint(0, 2**30)
-random.seed(NOISE_SEED)
-rng_global = random.Random(NOISE_SEED)
-
-# The angle determining the main road's position relative to the working face
-WORKING_FACE_ANGLE = rng_global.uniform(-math.pi, math.pi)
+def _derive_randomized_settings():
+    global NOISE_SEED, rng_global, WORKING_FACE_ANGLE
+    if NOISE_SEED is None:
+        NOISE_SEED = random.randint(0, 2**30)
+    random.seed(NOISE_SEED)
+    rng_global = random.Random(NOISE_SEED)
+
+    # The angle determining the main road's position relative to the working face
+    WORKING_FACE_ANGLE = rng_global.uniform(-math.pi, math.pi)
+
+_derive_randomized_settings()
+
+def configure(seed=None, **overrides):
+    """
+    Applies parameter overrides (e.g. MAX_DEPTH=80.0) and re-derives the
+    randomized settings from `seed` (None picks a random seed).
+    pit_generator, road_network, dump_generator, plateau_generator and
+    terrain derive state from these at import time and must be reloaded
+    afterwards, in that order.
+    """
+    params = globals()
+    for name, value in overrides.items():
+        if name in ("NOISE_SEED", "WORKING_FACE_ANGLE") or not name.isupper() or name not in params:
+            raise KeyError(f"'{name}' is not a tunable config parameter")
+        params[name] = value
+    params["NOISE_SEED"] = seed
+    _derive_randomized_settings()
+
+def settings():
+    """
+    Returns NOISE_SEED and every tunable parameter as a JSON-serializable
+    dict. Restore it with configure(s.pop("NOISE_SEED"), **s).
+    """
+    params = globals()
+    return {name: params[name] for name in sorted(params)
+            if name.isupper() and name != "WORKING_FACE_ANGLE"}
 
 
 # --- PLATEAU / DUMP MOUNTAIN PARAMETERS ---
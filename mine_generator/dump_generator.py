@@ -37,6 +37,10 @@ def build_dump_sectors():
 
 DUMP_SECTORS = build_dump_sectors()
 
+# FBM sample spacings on the current grid; dumps start at the pit rim
+_BENCH_SKIP_SPACING = utils.sample_spacing(0.9, cfg.MAX_PIT_RADIUS)
+_NOISE_SPACING = utils.sample_spacing(0.02)
+
 def _dump_height_from_sector(x, y, sector):
     """Calculates height contribution for a single dump sector."""
     center_angle, halfw, maxh, extent, weight = sector
@@ -61,14 +65,16 @@ def _dump_height_from_sector(x, y, sector):
     bench_idx = max(0, min(bench_count - 1, int(dist_out / bench_w)))
     base_elev = (bench_idx + 1) / float(max(1, bench_count)) * effective_maxh
     
-    n = utils.fbm(math.cos(theta)*0.9 + bench_idx*0.21, math.sin(theta)*0.9 + bench_idx*0.24, cfg.NOISE_SEED + bench_idx*7, octaves=2)
+    n = utils.fbm(math.cos(theta)*0.9 + bench_idx*0.21, math.sin(theta)*0.9 + bench_idx*0.24, cfg.NOISE_SEED + bench_idx*7, octaves=2,
+                  spacing=_BENCH_SKIP_SPACING)
     p = (n * 0.5 + 0.5)
     skip = 1.0
     if p > 0.65:
         severity = max(0.0, min(1.0, (p - 0.65) / (1.0 - 0.65)))
         skip = utils.lerp(1.0, 0.25, utils.smoothstep(severity))
     
-    noise_elev = utils.fbm((x + 123.4)*0.02, (y - 91.2)*0.02, cfg.NOISE_SEED + 19 + bench_idx, octaves=3) * (cfg.DUMP_NOISE_VARIATION * 0.5)
+    noise_elev = utils.fbm((x + 123.4)*0.02, (y - 91.2)*0.02, cfg.NOISE_SEED + 19 + bench_idx, octaves=3,
+                           spacing=_NOISE_SPACING) * (cfg.DUMP_NOISE_VARIATION * 0.5)
     
     elev = base_elev * skip + noise_elev
     
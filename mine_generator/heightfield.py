@@ -0,0 +1,85 @@
+# mine_generator/heightfield.py
+"""
+Compact heightfield representation.
+
+Only the Z values are stored, as a contiguous float32 raster. The x/y
+coordinates and the quad topology are fully determined by RESOLUTION and
+SIZE, so they are generated on demand as numpy arrays instead of being
+kept as Python lists of vertices and faces.
+"""
+import json
+
+import numpy as np
+
+from . import config as cfg
+
+class HeightField:
+    """
+    A square grid of Z values indexed [row, col] = [y, x], row-major.
+    `settings` optionally records the config.settings() it was generated with.
+    """
+
+    __slots__ = ("resolution", "size", "z", "settings")
+
+    def __init__(self, resolution=None, size=None, z=None, settings=None):
+        self.resolution = int(cfg.RESOLUTION if resolution is None else resolution)
+        self.size = float(cfg.SIZE if size is None else size)
+        if z is None:
+            z = np.zeros((self.resolution, self.resolution), dtype=np.float32)
+        else:
+            z = np.ascontiguousarray(z, dtype=np.float32).reshape(self.resolution, self.resolution)
+        self.z = z
+        self.settings = settings
+
+    # --- Grid metadata ---
+
+    @property
+    def half(self):
+        return self.size / 2.0
+
+    @property
+    def step(self):
+        return self.size / (self.resolution - 1)
+
+    @property
+    def vertex_count(self):
+        return self.resolution * self.resolution
+
+    @property
+    def face_count(self):
+        return (self.resolution - 1) * (self.resolution - 1)
+
+    def coords(self):
+        """World x (and y) coordinates of the grid columns (and rows)."""
+        return -self.half + np.arange(self.resolution, dtype=np.float64) * self.step
+
+    # --- Geometry arrays ---
+
+    def vertex_coords(self):
+        """Flat float32 array of x, y, z for every vertex (for foreach_set)."""
+        xs = self.coords().astype(np.float32)
+        co = np.empty((self.resolution, self.resolution, 3), dtype=np.float32)
+        co[:, :, 0] = xs[np.newaxis, :]
+        co[:, :, 1] = xs[:, np.newaxis]
+        co[:, :, 2] = self.z
+        return co.ravel()
+
+    def face_indices(self):
+        """(face_count, 4) int32 array of quad vertex indices."""
+        res = self.resolution
+        idx = np.arange(self.vertex_count, dtype=np.int32).reshape(res, res)[:-1, :-1].ravel()
+        return np.stack((idx, idx + 1, idx + res + 1, idx + res), axis=1)
+
+    # --- Export ---
+
+    def save(self, path):
+        """Writes the raster, its grid metadata and settings to a compressed .npz file."""
+        np.savez_compressed(path, z=self.z, resolution=self.resolution, size=self.size,
+                            settings=json.dumps(self.settings))
+
+    @classmethod
+    def load(cls, path):
+        """Reads a HeightField written by save()."""
+        with np.load(path) as data:
+            settings = json.loads(str(data["settings"])) if "settings" in data.files else None
+            return cls(int(data["resolution"]), float(data["size"]), data["z"], settings)
@@ -1,10 +1,11 @@
 # mine_generator/mesh_builder.py
 """
-Handles all Blender-specific operations: creating the mesh grid,
-applying vertex colors, and performing final mesh cleanup.
+Handles all Blender-specific operations: building the mesh from a
+HeightField, applying vertex colors, and performing final mesh cleanup.
 """
 import bpy
 import bmesh
+import numpy as np
 
 from . import config as cfg
 
@@ -17,74 +18,48 @@ def clear_scene():
     for block in bpy.data.meshes:
         bpy.data.meshes.remove(block)
 
-def make_grid():
-    """Creates the initial flat grid of vertices and faces."""
-    verts, faces = [], []
-    half = cfg.SIZE / 2.0
-    step = cfg.SIZE / (cfg.RESOLUTION - 1)
-    
-    for v_y in range(cfg.RESOLUTION):
-        y = -half + v_y * step
-        for v_x in range(cfg.RESOLUTION):
-            x = -half + v_x * step
-            verts.append([x, y, 0.0])
-            
-    for v_y in range(cfg.RESOLUTION - 1):
-        for v_x in range(cfg.RESOLUTION - 1):
-            i = v_y * cfg.RESOLUTION + v_x
-            a, b = i, i + 1
-            c, d = i + cfg.RESOLUTION + 1, i + cfg.RESOLUTION
-            faces.append((a, b, c, d))
-            
-    return verts, faces
-
-def apply_erosion(z_grid):
-    """Applies a simple hydraulic erosion simulation to a Z-height grid."""
-    width = height = cfg.RESOLUTION
-    offsets = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
-    
-    for _ in range(cfg.EROSION_ITERATIONS):
-        new_grid = z_grid.copy()
-        for y in range(1, height - 1):
-            for x in range(1, width - 1):
-                i = y * width + x
-                zc = z_grid[i]
-                neigh_sum = sum(z_grid[(y + dy) * width + (x + dx)] for dx, dy in offsets)
-                neigh_avg = neigh_sum / len(offsets)
-                delta = (neigh_avg - zc) * cfg.EROSION_RATE
-                steep_proxy = abs(neigh_avg - zc)
-                falloff = 1.0 / (1.0 + steep_proxy * 6.0)
-                new_grid[i] = zc + delta * falloff
-        z_grid = new_grid
-    return z_grid
+# Strata colors from the surface down: (upper bound of normalized depth, RGBA)
+STRATA_COLORS = [
+    (0.12, (0.78, 0.75, 0.66, 1.0)),  # Topsoil/Dumps
+    (0.33, (0.66, 0.56, 0.45, 1.0)),
+    (0.66, (0.50, 0.48, 0.50, 1.0)),
+    (None, (0.18, 0.15, 0.12, 1.0)),  # Deep rock
+]
 
-def _color_for_depth(z, zmin, zmax):
-    """Determines vertex color based on normalized depth."""
+def _colors_for_depth(z, zmin, zmax):
+    """Determines vertex colors for an array of heights based on normalized depth."""
     n = (zmax - z) / max(1e-6, (zmax - zmin))
-    if n < 0.12: return (0.78, 0.75, 0.66, 1.0)  # Topsoil/Dumps
-    elif n < 0.33: return (0.66, 0.56, 0.45, 1.0)
-    elif n < 0.66: return (0.50, 0.48, 0.50, 1.0)
-    else: return (0.18, 0.15, 0.12, 1.0)         # Deep rock
+    bounds = np.array([b for b, _ in STRATA_COLORS[:-1]], dtype=np.float32)
+    palette = np.array([c for _, c in STRATA_COLORS], dtype=np.float32)
+    return palette[np.searchsorted(bounds, n, side="right")]
 
-def add_vertex_colors(obj):
-    """Applies vertex colors to the mesh based on Z-height."""
+def add_vertex_colors(obj, hf):
+    """Applies vertex colors to the mesh based on the HeightField's Z values."""
     me = obj.data
-    zs = [v.co.z for v in me.vertices]
-    zmin, zmax = min(zs), max(zs)
-    
+    z = hf.z.ravel()
+    vert_colors = _colors_for_depth(z, float(z.min()), float(z.max()))
+
     col_layer = me.vertex_colors.new(name="StrataColor") if not me.vertex_colors else me.vertex_colors.active
-    
-    for poly in me.polygons:
-        for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-            v_idx = me.loops[loop_idx].vertex_index
-            color = _color_for_depth(me.vertices[v_idx].co.z, zmin, zmax)
-            col_layer.data[loop_idx].color = color
 
-def build_mesh_object(name, verts, faces):
-    """Creates a new mesh and object in the Blender scene."""
+    loop_verts = np.empty(len(me.loops), dtype=np.int32)
+    me.loops.foreach_get("vertex_index", loop_verts)
+    col_layer.data.foreach_set("color", vert_colors[loop_verts].ravel())
+
+def build_mesh_object(name, hf):
+    """Creates a new mesh and object in the Blender scene from a HeightField."""
     me = bpy.data.meshes.new(name + "_mesh")
-    me.from_pydata(verts, [], faces)
-    me.update()
+    faces = hf.face_indices()
+
+    me.vertices.add(hf.vertex_count)
+    me.vertices.foreach_set("co", hf.vertex_coords())
+    me.loops.add(faces.size)
+    me.loops.foreach_set("vertex_index", faces.ravel())
+    me.polygons.add(hf.face_count)
+    me.polygons.foreach_set("loop_start", np.arange(0, faces.size, 4, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        me.polygons.foreach_set("loop_total", np.full(hf.face_count, 4, dtype=np.int32))
+    me.update(calc_edges=True)
+
     obj = bpy.data.objects.new(name, me)
     bpy.context.collection.objects.link(obj)
     bpy.context.view_layer.objects.active = obj
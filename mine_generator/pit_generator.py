@@ -4,11 +4,11 @@ Handles the procedural generation of the open-pit mine geometry,
 including benches, roads, ramps, and multi-pit blending.
 """
 import math
-import random
 
 # Import from our own package
 from . import config as cfg
 from . import utils
+from . import road_network
 
 def generate_pit_centers():
     """Generates the locations and scales of all pits, including the main one."""
@@ -28,6 +28,15 @@ def generate_pit_centers():
 
 PIT_CENTERS = generate_pit_centers()
 
+# FBM sample spacings on the current grid; angular lookups use the outline radius
+_BENCH_WIDTH_SPACING = utils.sample_spacing(0.22, cfg.MAX_PIT_RADIUS)
+_BOUNDARY_SPACING = utils.sample_spacing(cfg.BOUNDARY_NOISE_SCALE, cfg.MAX_PIT_RADIUS)
+_RADIAL_SPACING = utils.sample_spacing(0.32, cfg.MAX_PIT_RADIUS)
+_SKIP_SPACING = utils.sample_spacing(0.7, cfg.MAX_PIT_RADIUS)
+_GROUND_SPACING = utils.sample_spacing(0.0038)
+_JITTER_SPACING = utils.sample_spacing(cfg.NOISE_MED_SCALE)
+_MICRO_SPACING = utils.sample_spacing(cfg.NOISE_HIGH_SCALE * 2.0)
+
 # ... (Helper functions for benches, roads, ramps, etc.) ...
 # [All functions from `total_bench_count` to `depth_at_for_center` go here]
 
@@ -46,14 +55,16 @@ def bench_horizontal_radius_for_index(idx, theta, size_scale=1.0):
     base_radius = (1.0 - t) * cfg.MAX_PIT_RADIUS * size_scale
     perturb = utils.fbm(math.cos(theta) * 0.22 + idx * 0.13,
                   math.sin(theta) * 0.22 + idx * 0.19,
-                  cfg.NOISE_SEED + idx * 9, octaves=2)
+                  cfg.NOISE_SEED + idx * 9, octaves=2,
+                  spacing=_BENCH_WIDTH_SPACING)
     width_jitter = (perturb * 0.5 + 0.5) * (cfg.MEAN_BENCH_WIDTH - cfg.MIN_BENCH_WIDTH)
     r_base = base_radius + width_jitter + (idx * 0.01)
     
     sx = math.cos(theta) * cfg.BOUNDARY_NOISE_SCALE
     sy = math.sin(theta) * cfg.BOUNDARY_NOISE_SCALE
     seed_for_bench = cfg.NOISE_SEED + int(idx * (cfg.BOUNDARY_PER_BENCH_VARIATION * 1000))
-    noise_val = utils.fbm(sx, sy, seed_for_bench, octaves=cfg.BOUNDARY_FBM_OCTAVES)
+    noise_val = utils.fbm(sx, sy, seed_for_bench, octaves=cfg.BOUNDARY_FBM_OCTAVES,
+                          spacing=_BOUNDARY_SPACING)
     
     weight = utils.smoothstep(max(0.0, (t - 0.0) / 1.0))
     deformation = cfg.BOUNDARY_NOISE_STRENGTH * noise_val * weight
@@ -62,14 +73,16 @@ def bench_horizontal_radius_for_index(idx, theta, size_scale=1.0):
     return r_distorted
 
 def radial_variation(theta):
-    return utils.fbm(math.cos(theta) * 0.32, math.sin(theta) * 0.32, cfg.NOISE_SEED, octaves=3) * 0.48
+    return utils.fbm(math.cos(theta) * 0.32, math.sin(theta) * 0.32, cfg.NOISE_SEED, octaves=3,
+                     spacing=_RADIAL_SPACING) * 0.48
 
 def compute_effective_radius(theta, size_scale=1.0, use_road_smooth=True):
     base = cfg.MAX_PIT_RADIUS * size_scale
     broad = radial_variation(theta) * (cfg.MAX_PIT_RADIUS * 0.11 * size_scale)
     sx = math.cos(theta) * cfg.BOUNDARY_NOISE_SCALE
     sy = math.sin(theta) * cfg.BOUNDARY_NOISE_SCALE
-    rim_noise = utils.fbm(sx, sy, cfg.NOISE_SEED + 3, octaves=cfg.BOUNDARY_FBM_OCTAVES)
+    rim_noise = utils.fbm(sx, sy, cfg.NOISE_SEED + 3, octaves=cfg.BOUNDARY_FBM_OCTAVES,
+                          spacing=_BOUNDARY_SPACING)
     rim_deformation = rim_noise * (cfg.MAX_PIT_RADIUS * cfg.BOUNDARY_NOISE_STRENGTH * size_scale)
     eff = base + broad + rim_deformation
     
@@ -88,54 +101,9 @@ def road_spiral_theta_from_radius(r, effective_radius):
     frac = max(0.0, min(1.0, frac))
     return cfg.WORKING_FACE_ANGLE + frac * (cfg.ROAD_SPIRAL_TURNS * 2.0 * math.pi)
 
-def is_on_main_road(x, y, eff_r):
-    r = math.hypot(x, y)
-    theta = math.atan2(y, x)
-    if r > eff_r:
-        return False, 0.0, 0.0
-    spiral_theta = road_spiral_theta_from_radius(r, eff_r)
-    d = (theta - spiral_theta + math.pi) % (2.0 * math.pi) - math.pi
-    arc = abs(d) * max(1e-6, r)
-    on = arc <= cfg.ROAD_WIDTH
-    return on, arc
-
-def branch_ramp_mask(x, y, eff_r):
-    r = math.hypot(x, y)
-    theta = math.atan2(y, x)
-    if r > eff_r:
-        return 0.0
-    rng = random.Random(int(cfg.NOISE_SEED) ^ 0xA5A5)
-    base_angles = [rng.uniform(-math.pi, math.pi) for _ in range(cfg.BRANCH_RAMP_COUNT)]
-    mask_val = 0.0
-    for a in base_angles:
-        d = (theta - a + math.pi) % (2.0 * math.pi) - math.pi
-        if abs(d) < cfg.BRANCH_ANGLE_SPREAD:
-            frac = 1.0 - (r / eff_r)
-            branch_len = cfg.BRANCH_LENGTH_FACTOR + (utils.fbm(math.cos(a)*0.2, math.sin(a)*0.2, cfg.NOISE_SEED, octaves=2) * 0.12)
-            if frac < branch_len:
-                ang_fall = 1.0 - (abs(d) / cfg.BRANCH_ANGLE_SPREAD)
-                mask_val = max(mask_val, ang_fall * (1.0 - (frac / branch_len)))
-    return max(0.0, min(1.0, mask_val))
-
-def secondary_ramp_mask(x, y, eff_r):
-    r = math.hypot(x, y)
-    theta = math.atan2(y, x)
-    if r > eff_r:
-        return 0.0
-    rng = random.Random(int(cfg.NOISE_SEED) ^ 0x5EED)
-    sec_angles = [rng.uniform(-math.pi, math.pi) for _ in range(cfg.SECONDARY_RAMP_COUNT)]
-    mask_val = 0.0
-    for a in sec_angles:
-        d = (theta - a + math.pi) % (2.0 * math.pi) - math.pi
-        if abs(d) < cfg.SECONDARY_RAMP_ARC:
-            frac = 1.0 - (r / eff_r)
-            if frac < cfg.SECONDARY_RAMP_LENGTH:
-                ang_fall = 1.0 - (abs(d) / cfg.SECONDARY_RAMP_ARC)
-                mask_val = max(mask_val, ang_fall * (1.0 - (frac / cfg.SECONDARY_RAMP_LENGTH)))
-    return mask_val
-
 def bench_skip_factor(idx, theta):
-    n = utils.fbm(math.cos(theta)*0.7 + idx*0.19, math.sin(theta)*0.7 + idx*0.23, cfg.NOISE_SEED + idx*13, octaves=2)
+    n = utils.fbm(math.cos(theta)*0.7 + idx*0.19, math.sin(theta)*0.7 + idx*0.23, cfg.NOISE_SEED + idx*13, octaves=2,
+                  spacing=_SKIP_SPACING)
     p = (n * 0.5 + 0.5)
     if p < cfg.BENCH_SKIP_PROBABILITY:
         return 1.0
@@ -144,14 +112,15 @@ def bench_skip_factor(idx, theta):
         severity = max(0.0, min(1.0, severity))
         return utils.lerp(1.0, cfg.BENCH_SKIP_REDUCTION, utils.smoothstep(severity))
 
-def _depth_at_for_center(x, y, cx, cy, size_scale, depth_scale):
+def _depth_at_for_center(x, y, cx, cy, size_scale, depth_scale, pit_idx=0):
     """Internal function to calculate depth for a single pit center."""
     lx, ly = x - cx, y - cy
     r, theta = math.hypot(lx, ly), math.atan2(ly, lx)
     
     eff_r = compute_effective_radius(theta, size_scale)
     if r > eff_r:
-        return utils.fbm((x + cx) * 0.0038, (y + cy) * 0.0038, cfg.NOISE_SEED + 21, octaves=4) * 1.2 * cfg.VERTICAL_SCALE * 0.6
+        return utils.fbm((x + cx) * 0.0038, (y + cy) * 0.0038, cfg.NOISE_SEED + 21, octaves=4,
+                         spacing=_GROUND_SPACING) * 1.2 * cfg.VERTICAL_SCALE * 0.6
 
     idx = bench_index_for_radius(r, eff_r, depth_scale)
     bench_depth = idx * cfg.BENCH_HEIGHT * depth_scale
@@ -161,18 +130,13 @@ def _depth_at_for_center(x, y, cx, cy, size_scale, depth_scale):
     edge_blur = max(1.0, cfg.MIN_BENCH_WIDTH * 0.5)
     edge_blend = utils.smoothstep((dist_to_rim + edge_blur) / edge_blur)
     
-    on_road, arc = is_on_main_road(lx, ly, eff_r)
-    if on_road:
-        road_strength = utils.lerp(1.0, 0.0, min(1.0, arc / (cfg.ROAD_WIDTH * 1.3)))
-        bench_depth *= utils.lerp(1.0, cfg.ROAD_FLATTEN, road_strength * (0.9 + 0.1 * size_scale))
-
-    branch_mask = branch_ramp_mask(lx, ly, eff_r)
+    branch_mask = road_network.ramp_mask(pit_idx, "branch", x, y)
     if branch_mask > 1e-4:
         frac = 1.0 - (r / eff_r)
         ramp_strength = utils.smoothstep(frac) * branch_mask
         bench_depth *= utils.lerp(1.0, 0.38, ramp_strength * (0.8 + 0.2 * size_scale))
 
-    sec_mask = secondary_ramp_mask(lx, ly, eff_r)
+    sec_mask = road_network.ramp_mask(pit_idx, "secondary", x, y)
     if sec_mask > 1e-4:
         frac = 1.0 - (r / eff_r)
         ramp_strength = utils.smoothstep(frac) * sec_mask
@@ -193,20 +157,52 @@ def _depth_at_for_center(x, y, cx, cy, size_scale, depth_scale):
         pad_blend = utils.smoothstep(1.0 - (r / (cfg.BOTTOM_PAD_RADIUS * size_scale)))
         bench_depth = utils.lerp(bench_depth, pad_depth, pad_blend)
 
-    jitter = utils.fbm((x + cx) * cfg.NOISE_MED_SCALE, (y + cy) * cfg.NOISE_MED_SCALE, cfg.NOISE_SEED + idx*11, octaves=3) * (cfg.BENCH_HEIGHT * 0.24)
-    micro = utils.fbm((x + cx) * cfg.NOISE_HIGH_SCALE * 2.0, (y + cy) * cfg.NOISE_HIGH_SCALE * 2.0, cfg.NOISE_SEED + 97, octaves=2) * cfg.MICRO_AMPL
+    # The main road is cut at a constant grade from the rim down to the bottom
+    # pad, across the full core of its width, and blends into the benches at its edges
+    road_half_width = cfg.ROAD_WIDTH * 0.5
+    road_strength = 0.0
+    road_dist = road_network.main_road_distance(pit_idx, x, y)
+    if road_dist < road_half_width:
+        road_depth = road_network.main_road_progress(pit_idx, x, y) * cfg.MAX_DEPTH * depth_scale * cfg.ROAD_FLATTEN
+        road_strength = utils.smoothstep((road_half_width - road_dist) / (road_half_width * 0.5))
+        bench_depth = utils.lerp(bench_depth, road_depth, road_strength)
+
+    jitter = utils.fbm((x + cx) * cfg.NOISE_MED_SCALE, (y + cy) * cfg.NOISE_MED_SCALE, cfg.NOISE_SEED + idx*11, octaves=3,
+                       spacing=_JITTER_SPACING) * (cfg.BENCH_HEIGHT * 0.24)
+    micro = utils.fbm((x + cx) * cfg.NOISE_HIGH_SCALE * 2.0, (y + cy) * cfg.NOISE_HIGH_SCALE * 2.0, cfg.NOISE_SEED + 97, octaves=2,
+                      spacing=_MICRO_SPACING) * cfg.MICRO_AMPL
     
     if preserve_weight > 0.0:
         ease = utils.smoothstep(preserve_weight)
         jitter *= utils.lerp(cfg.CENTER_JITTER_REDUCTION, 1.0, (1.0 - ease))
         micro *= utils.lerp(cfg.CENTER_JITTER_REDUCTION, 1.0, (1.0 - ease))
     
-    bench_depth += jitter * (1.0 - edge_blend) + micro * 0.5
+    # Bench-edge jitter switches at bench boundaries, so keep it off the road surface
+    bench_depth += jitter * (1.0 - edge_blend) * (1.0 - road_strength) + micro * 0.5
     
     final_z = -max(0.0, min(cfg.MAX_DEPTH * depth_scale, bench_depth)) * cfg.VERTICAL_SCALE
     return final_z
 
+def is_inside_pit(x, y):
+    """True if the point lies within the (deformed) rim of any pit."""
+    for cx, cy, size, _ in PIT_CENTERS:
+        lx, ly = x - cx, y - cy
+        if math.hypot(lx, ly) <= compute_effective_radius(math.atan2(ly, lx), size):
+            return True
+    return False
+
+def compute_pit_depth_and_index(x, y):
+    """
+    Computes the final pit depth by blending contributions from all pit
+    centers, and returns it with the index of the pit that produced it
+    (None if there are no pits).
+    """
+    depths = [_depth_at_for_center(x, y, cx, cy, size, depth, i) for i, (cx, cy, size, depth) in enumerate(PIT_CENTERS)]
+    if not depths:
+        return 0.0, None
+    idx = min(range(len(depths)), key=depths.__getitem__)
+    return depths[idx], idx
+
 def compute_pit_depth(x, y):
     """Computes the final pit depth by blending contributions from all pit centers."""
-    depths = [_depth_at_for_center(x, y, cx, cy, size, depth) for cx, cy, size, depth in PIT_CENTERS]
-    return min(depths) if depths else 0.0
\ No newline at end of file
+    return compute_pit_depth_and_index(x, y)[0]
\ No newline at end of file
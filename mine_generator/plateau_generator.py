@@ -9,6 +9,9 @@ from . import utils
 from . import config as cfg
 from . import pit_generator
 
+# FBM sample spacing of the plateau surface noise on the current grid
+_NOISE_SPACING = utils.sample_spacing(0.02)
+
 def compute_plateau_height_at(x, y):
     """Plateau as flipped pit with rim blending + flat top + pseudo roads."""
     import math
@@ -45,7 +48,8 @@ def compute_plateau_height_at(x, y):
 
     # --- Noise for realism ---
     noise = utils.fbm(
-        x * 0.02, y * 0.02, cfg.NOISE_SEED + 2021, octaves=3
+        x * 0.02, y * 0.02, cfg.NOISE_SEED + 2021, octaves=3,
+        spacing=_NOISE_SPACING
     ) * cfg.PLATEAU_NOISE_AMPLITUDE
     plateau_h += noise
 
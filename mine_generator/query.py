@@ -0,0 +1,257 @@
+# mine_generator/query.py
+"""
+Batched elevation queries at arbitrary (x, y) points.
+
+Two modes are available:
+  * "raster" bilinearly samples the cached final heightfield (erosion and
+    edge blending included) and is cheap enough for millions of points.
+  * "exact" evaluates the analytic pit/dump/plateau layers plus edge blending
+    at every point. Erosion is a grid operation and is not part of this mode.
+    It runs the scalar generator once per point (five times with gradients),
+    roughly milliseconds per point, so it is meant for spot checks and
+    validation, not for per-frame queries. It is also not resolution-free:
+    road flattening samples the rasterized road distance fields and the FBM
+    band limit uses the grid spacing, so results depend on RESOLUTION.
+
+Run ``python -m mine_generator.query --serve`` to answer queries over
+stdin/stdout, or add ``--port N`` to listen on a local TCP socket, so that a
+simulator can keep one generator process alive between frames. ``--save``
+writes the generated heightfield, with the seed and settings it was generated
+with, to an .npz file. ``--heightfield`` serves queries from such a file
+without regenerating it; the generator is reconfigured from the recorded
+settings so that exact mode describes the same terrain.
+"""
+import argparse
+import collections
+import importlib
+import json
+import socketserver
+import sys
+
+import numpy as np
+
+from . import config as cfg
+from . import pit_generator
+from . import road_network
+from . import dump_generator
+from . import plateau_generator
+from . import terrain
+from . import heightfield
+
+ElevationSample = collections.namedtuple("ElevationSample", "z gradient normal")
+
+# Finite-difference step (world units) for gradients in exact mode
+EXACT_GRADIENT_STEP = 0.25
+
+_HEIGHTFIELD = None
+
+def get_heightfield(refresh=False):
+    """Returns the cached final HeightField, generating it on first use."""
+    global _HEIGHTFIELD
+    if _HEIGHTFIELD is None or refresh:
+        _HEIGHTFIELD = terrain.generate_heightfield(verbose=False)
+    return _HEIGHTFIELD
+
+def set_heightfield(hf):
+    """Uses an already generated (or loaded) HeightField as the raster cache."""
+    global _HEIGHTFIELD
+    _HEIGHTFIELD = hf
+
+def clear_cache():
+    """Drops the cached heightfield, e.g. after the configuration has changed."""
+    global _HEIGHTFIELD
+    _HEIGHTFIELD = None
+
+def _as_xy(x, y=None):
+    """Accepts either separate x/y arrays or a single (N, 2) array of finite points."""
+    if y is None:
+        pts = np.asarray(x, dtype=np.float64)
+        if pts.size and (pts.ndim != 2 or pts.shape[1] != 2):
+            raise ValueError("points must be a sequence of [x, y] pairs")
+        pts = pts.reshape(-1, 2)
+        xs, ys = pts[:, 0], pts[:, 1]
+    else:
+        xs, ys = np.asarray(x, dtype=np.float64).ravel(), np.asarray(y, dtype=np.float64).ravel()
+        if xs.shape != ys.shape:
+            raise ValueError("x and y must have the same number of values")
+    if not (np.isfinite(xs).all() and np.isfinite(ys).all()):
+        raise ValueError("point coordinates must be finite")
+    return xs, ys
+
+def _normals_from_gradient(gx, gy):
+    """Unit surface normals for z = f(x, y) given its partial derivatives."""
+    inv = 1.0 / np.sqrt(gx * gx + gy * gy + 1.0)
+    return np.stack((-gx * inv, -gy * inv, inv), axis=1)
+
+def sample_raster(x, y=None):
+    """
+    Bilinearly samples the cached final heightfield at a batch of points.
+    Points outside the grid are clamped to its border.
+    Returns an ElevationSample of z (N,), gradient (N, 2) and normal (N, 3).
+    """
+    xs, ys = _as_xy(x, y)
+    hf = get_heightfield()
+    grid, res, half, step = hf.z, hf.resolution, hf.half, hf.step
+
+    fx = np.clip((xs + half) / step, 0.0, res - 1)
+    fy = np.clip((ys + half) / step, 0.0, res - 1)
+    ix = np.minimum(fx.astype(np.intp), res - 2)
+    iy = np.minimum(fy.astype(np.intp), res - 2)
+    tx = fx - ix
+    ty = fy - iy
+
+    z00 = grid[iy, ix]
+    z10 = grid[iy, ix + 1]
+    z01 = grid[iy + 1, ix]
+    z11 = grid[iy + 1, ix + 1]
+
+    z0 = z00 + (z10 - z00) * tx
+    z1 = z01 + (z11 - z01) * tx
+    z = z0 + (z1 - z0) * ty
+
+    gx = ((z10 - z00) * (1.0 - ty) + (z11 - z01) * ty) / step
+    gy = (z1 - z0) / step
+    return ElevationSample(z, np.stack((gx, gy), axis=1), _normals_from_gradient(gx, gy))
+
+def _exact_height(x, y):
+    return terrain.edge_blend_at(x, y, terrain.compute_height_at(x, y))
+
+def sample_exact(x, y=None, gradients=True):
+    """
+    Evaluates the analytic layers and edge blending at a batch of points.
+    This is a Python loop over the scalar generator (the noise backend has no
+    array API), so use it for spot checks only; use sample_raster for bulk
+    queries. Gradients use central differences and cost four extra
+    evaluations per point; pass gradients=False to get z only (gradient and
+    normal are None).
+    """
+    xs, ys = _as_xy(x, y)
+    z = np.fromiter((_exact_height(px, py) for px, py in zip(xs.tolist(), ys.tolist())),
+                    dtype=np.float64, count=xs.size)
+    if not gradients:
+        return ElevationSample(z, None, None)
+
+    h = EXACT_GRADIENT_STEP
+    gx = np.empty_like(z)
+    gy = np.empty_like(z)
+    for i, (px, py) in enumerate(zip(xs.tolist(), ys.tolist())):
+        gx[i] = (_exact_height(px + h, py) - _exact_height(px - h, py)) / (2.0 * h)
+        gy[i] = (_exact_height(px, py + h) - _exact_height(px, py - h)) / (2.0 * h)
+    return ElevationSample(z, np.stack((gx, gy), axis=1), _normals_from_gradient(gx, gy))
+
+def query(x, y=None, mode="raster", gradients=True):
+    """Dispatches a batched query to the raster or exact sampler."""
+    if mode == "raster":
+        return sample_raster(x, y)
+    if mode == "exact":
+        return sample_exact(x, y, gradients=gradients)
+    raise ValueError(f"Unknown query mode '{mode}' (expected 'raster' or 'exact').")
+
+# ---------------------- SERVER MODE ----------------------
+#
+# Line-oriented protocol, one request per line:
+#   JSON:   {"mode": "raster", "points": [[x, y], ...]}
+#           -> {"z": [...], "gradient": [[gx, gy], ...], "normal": [[nx, ny, nz], ...]}
+#   Binary: {"mode": "raster", "count": N} followed by N * 2 little-endian
+#           float64 values (x0, y0, x1, y1, ...)
+#           -> {"count": N, "fields": ["z", "gradient", "normal"]} followed by
+#              N z values, N * 2 gradient values and N * 3 normal values (float64)
+# Errors are reported as {"error": "..."} and the connection stays open. A
+# binary header with an invalid "count" is rejected without reading a payload.
+
+def _write_json(wfile, obj):
+    wfile.write(json.dumps(obj).encode("utf-8") + b"\n")
+
+def _handle_request(line, rfile, wfile):
+    """Serves one request line; returns False once the stream is exhausted."""
+    try:
+        header = json.loads(line)
+        if not isinstance(header, dict):
+            raise ValueError("request must be a JSON object")
+        mode = header.get("mode", "raster")
+        gradients = bool(header.get("gradients", True))
+        if "count" in header:
+            count = header["count"]
+            if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+                raise ValueError("count must be a non-negative integer")
+            payload = rfile.read(count * 16)
+            if len(payload) != count * 16:
+                return False
+            pts = np.frombuffer(payload, dtype="<f8").reshape(count, 2)
+            res = query(pts, mode=mode, gradients=gradients)
+            fields = ["z"] if res.gradient is None else ["z", "gradient", "normal"]
+            _write_json(wfile, {"count": count, "fields": fields})
+            for name in fields:
+                wfile.write(np.ascontiguousarray(getattr(res, name), dtype="<f8").tobytes())
+        else:
+            res = query(header["points"], mode=mode, gradients=gradients)
+            out = {"z": res.z.tolist()}
+            if res.gradient is not None:
+                out["gradient"] = res.gradient.tolist()
+                out["normal"] = res.normal.tolist()
+            _write_json(wfile, out)
+    except Exception as e:
+        # One bad request must not take the server down
+        _write_json(wfile, {"error": f"{type(e).__name__}: {e}"})
+    wfile.flush()
+    return True
+
+def _serve_stream(rfile, wfile):
+    for line in iter(rfile.readline, b""):
+        if line.strip() and not _handle_request(line, rfile, wfile):
+            break
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        _serve_stream(self.rfile, self.wfile)
+
+class _QueryServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+def serve_stdin():
+    """Answers queries on stdin, writing responses to stdout."""
+    _serve_stream(sys.stdin.buffer, sys.stdout.buffer)
+
+def serve_socket(port, host="127.0.0.1"):
+    """Answers queries on a local TCP socket until interrupted."""
+    with _QueryServer((host, port), _QueryHandler) as server:
+        print(f"Elevation query server listening on {host}:{server.server_address[1]}", file=sys.stderr)
+        server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batched elevation queries for the mine terrain.")
+    parser.add_argument("--serve", action="store_true", help="serve queries instead of exiting")
+    parser.add_argument("--port", type=int, default=None, help="listen on this local TCP port instead of stdin")
+    parser.add_argument("--heightfield", metavar="PATH", default=None,
+                        help="serve queries from a heightfield saved with --save")
+    parser.add_argument("--save", metavar="PATH", default=None, help="write the heightfield cache to an .npz file")
+    args = parser.parse_args(argv)
+
+    if args.heightfield:
+        print(f"Loading heightfield from {args.heightfield}...", file=sys.stderr)
+        hf = heightfield.HeightField.load(args.heightfield)
+        if hf.settings is None:
+            parser.error(f"{args.heightfield} does not record its generator settings; re-create it with --save")
+        settings = dict(hf.settings)
+        cfg.configure(settings.pop("NOISE_SEED"), **settings)
+        for module in (pit_generator, road_network, dump_generator, plateau_generator, terrain):
+            importlib.reload(module)
+        set_heightfield(hf)
+        print(f"Seed: {cfg.NOISE_SEED} (restored)", file=sys.stderr)
+    else:
+        print(f"Seed: {cfg.NOISE_SEED}", file=sys.stderr)
+        print("Building heightfield cache...", file=sys.stderr)
+    hf = get_heightfield()
+    if args.save:
+        hf.save(args.save)
+        print(f"Saved heightfield to {args.save}", file=sys.stderr)
+    if not args.serve:
+        return
+    if args.port is None:
+        serve_stdin()
+    else:
+        serve_socket(args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+# mine_generator/road_network.py
+"""
+Explicit haul road and ramp geometry.
+
+Road and ramp paths are generated once per pit, rasterized onto the terrain
+grid and converted to distance fields with a linear-time Euclidean distance
+transform. The pit generator cuts the main road and flattens the ramps from
+these fields instead of testing every vertex against the spiral equation and
+the ramp wedges: the main road descends at a constant rate from the rim to
+the bottom pad, following the progress of its nearest centerline point.
+
+For export, the paths are sampled against the generated pit surface to give
+3D centerlines with per-segment grades. The heights are those of the pit
+layer before erosion and edge blending, so they ignore any dump or plateau
+piled over a road. Ramp grades follow the benches the ramps are cut into.
+"""
+import collections
+import json
+import math
+import random
+import sys
+
+import numpy as np
+
+from . import config as cfg
+from . import utils
+from . import pit_generator
+
+# points: [(x, y, z), ...] from the rim inwards, z sampled from the pit surface;
+# grades: dz/ds for each segment
+Centerline = collections.namedtuple("Centerline", "pit kind points grades")
+
+# Planar road geometry the distance fields are built from. points: [(x, y), ...]
+# from the rim inwards; values: per-point spiral progress for the main road, or
+# the ramp half-width at each point for ramps
+RoadPath = collections.namedtuple("RoadPath", "pit kind points values")
+
+_EDT_INF = 1e20
+
+_BRANCH_RAMPS = None
+_SECONDARY_RAMPS = None
+_PATHS = None
+_CENTERLINES = None
+_FIELDS = None
+
+def branch_ramps():
+    """Returns the cached (angle, length_fraction) pairs of the branch ramps."""
+    global _BRANCH_RAMPS
+    if _BRANCH_RAMPS is None:
+        rng = random.Random(int(cfg.NOISE_SEED) ^ 0xA5A5)
+        base_angles = [rng.uniform(-math.pi, math.pi) for _ in range(cfg.BRANCH_RAMP_COUNT)]
+        _BRANCH_RAMPS = [
+            (a, cfg.BRANCH_LENGTH_FACTOR + (utils.fbm(math.cos(a)*0.2, math.sin(a)*0.2, cfg.NOISE_SEED, octaves=2) * 0.12))
+            for a in base_angles
+        ]
+    return _BRANCH_RAMPS
+
+def secondary_ramps():
+    """Returns the cached (angle, length_fraction) pairs of the secondary ramps."""
+    global _SECONDARY_RAMPS
+    if _SECONDARY_RAMPS is None:
+        rng = random.Random(int(cfg.NOISE_SEED) ^ 0x5EED)
+        sec_angles = [rng.uniform(-math.pi, math.pi) for _ in range(cfg.SECONDARY_RAMP_COUNT)]
+        _SECONDARY_RAMPS = [(a, cfg.SECONDARY_RAMP_LENGTH) for a in sec_angles]
+    return _SECONDARY_RAMPS
+
+def _main_road(pit_idx, cx, cy, size_scale):
+    """
+    Spiral haul road from the rim (frac=0) towards the pit centre (frac=1),
+    ending where it reaches the bottom pad. Its points are spaced evenly in
+    frac, which main_road_field records as the road's progress.
+    """
+    eff_max = cfg.MAX_PIT_RADIUS * size_scale * 1.3
+    approx_len = math.pi * eff_max * cfg.ROAD_SPIRAL_TURNS
+    n = max(8, int(math.ceil(approx_len / cfg.ROAD_SAMPLE_SPACING)))
+    frac_end = max(0.0, 1.0 - cfg.BOTTOM_PAD_RADIUS / cfg.MAX_PIT_RADIUS)
+    points, fracs = [], []
+    for i in range(n + 1):
+        frac = frac_end * i / float(n)
+        fracs.append(frac)
+        theta = cfg.WORKING_FACE_ANGLE + frac * (cfg.ROAD_SPIRAL_TURNS * 2.0 * math.pi)
+        r = (1.0 - frac) * pit_generator.compute_effective_radius(theta, size_scale)
+        points.append((cx + r * math.cos(theta), cy + r * math.sin(theta)))
+    return RoadPath(pit_idx, "main", points, fracs)
+
+def _radial_ramp(pit_idx, kind, cx, cy, angle, length_frac, half_angle, size_scale):
+    """
+    Straight ramp running inwards from the rim along a fixed angle. Its
+    half-width at each point is the arc `half_angle` spans at that radius.
+    """
+    eff_r = pit_generator.compute_effective_radius(angle, size_scale)
+    length_frac = max(0.0, min(1.0, length_frac))
+    n = max(2, int(math.ceil(eff_r * length_frac / cfg.ROAD_SAMPLE_SPACING)))
+    points, half_widths = [], []
+    for i in range(n + 1):
+        r = (1.0 - length_frac * i / float(n)) * eff_r
+        points.append((cx + r * math.cos(angle), cy + r * math.sin(angle)))
+        half_widths.append(half_angle * r)
+    return RoadPath(pit_idx, kind, points, half_widths)
+
+def build_paths():
+    """Generates the planar main road and ramp paths for every pit."""
+    paths = []
+    for pit_idx, (cx, cy, size_scale, _) in enumerate(pit_generator.PIT_CENTERS):
+        paths.append(_main_road(pit_idx, cx, cy, size_scale))
+        for a, length_frac in branch_ramps():
+            paths.append(_radial_ramp(pit_idx, "branch", cx, cy, a, length_frac, cfg.BRANCH_ANGLE_SPREAD, size_scale))
+        for a, length_frac in secondary_ramps():
+            paths.append(_radial_ramp(pit_idx, "secondary", cx, cy, a, length_frac, cfg.SECONDARY_RAMP_ARC, size_scale))
+    return paths
+
+def get_paths():
+    """Returns the cached road paths, building them on first use."""
+    global _PATHS
+    if _PATHS is None:
+        _PATHS = build_paths()
+    return _PATHS
+
+def _centerline(path, samples):
+    grades = []
+    for (x0, y0, z0), (x1, y1, z1) in zip(samples, samples[1:]):
+        run = math.hypot(x1 - x0, y1 - y0)
+        grades.append((z1 - z0) / run if run > 1e-9 else 0.0)
+    return Centerline(path.pit, path.kind, samples, grades)
+
+def build_centerlines():
+    """
+    Samples the pit surface along every road path, giving 3D centerlines whose
+    heights and grades match the generated pit layer (before erosion). Where a
+    deeper neighbouring pit cuts through a road, that stretch no longer
+    exists, so the path is split into one centerline per surviving piece
+    (pieces shorter than a road width are dropped).
+    """
+    lines = []
+    for path in get_paths():
+        pieces = [[]]
+        for x, y in path.points:
+            z, pit_idx = pit_generator.compute_pit_depth_and_index(x, y)
+            if pit_idx == path.pit:
+                pieces[-1].append((x, y, z))
+            elif pieces[-1]:
+                pieces.append([])
+        for samples in pieces:
+            length = sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(samples, samples[1:]))
+            if length >= cfg.ROAD_WIDTH:
+                lines.append(_centerline(path, samples))
+    return lines
+
+def get_centerlines():
+    """Returns the cached centerlines, building them on first use."""
+    global _CENTERLINES
+    if _CENTERLINES is None:
+        _CENTERLINES = build_centerlines()
+    return _CENTERLINES
+
+# ---------------------- RASTERIZATION & DISTANCE FIELDS ----------------------
+
+def _edt_1d(f):
+    """
+    Exact 1D squared Euclidean distance transform of a sampled function
+    (Felzenszwalb & Huttenlocher), linear in len(f). Returns the distances
+    and, for every sample, the index of the sample that attains it.
+    """
+    n = len(f)
+    d = [0.0] * n
+    nearest = [0] * n
+    v = [0] * n
+    z = [0.0] * (n + 1)
+    k = 0
+    z[0], z[1] = -_EDT_INF, _EDT_INF
+    for q in range(1, n):
+        fq = f[q] + q * q
+        p = v[k]
+        s = (fq - (f[p] + p * p)) / (2.0 * (q - p))
+        while s <= z[k]:
+            k -= 1
+            p = v[k]
+            s = (fq - (f[p] + p * p)) / (2.0 * (q - p))
+        k += 1
+        v[k] = q
+        z[k] = s
+        z[k + 1] = _EDT_INF
+    k = 0
+    for q in range(n):
+        while z[k + 1] < q:
+            k += 1
+        p = v[k]
+        d[q] = (q - p) * (q - p) + f[p]
+        nearest[q] = p
+    return d, nearest
+
+def distance_transform(seeds, return_nearest=False):
+    """
+    Euclidean distance (in cells) from every cell to the nearest True cell of
+    a 2D boolean array, computed in linear time with two separable passes.
+    With return_nearest=True, also returns the (rows, cols) index arrays of
+    that nearest True cell.
+    """
+    rows, cols = seeds.shape
+    grid = np.where(seeds, 0.0, _EDT_INF)
+    seed_row = np.empty((rows, cols), dtype=np.intp)
+    for c in range(cols):
+        grid[:, c], seed_row[:, c] = _edt_1d(grid[:, c].tolist())
+    nearest_col = np.empty((rows, cols), dtype=np.intp)
+    for r in range(rows):
+        grid[r, :], nearest_col[r, :] = _edt_1d(grid[r, :].tolist())
+    dist = np.sqrt(grid)
+    if not return_nearest:
+        return dist
+    nearest_row = seed_row[np.arange(rows)[:, np.newaxis], nearest_col]
+    return dist, (nearest_row, nearest_col)
+
+def _grid_indices(x, y):
+    half = cfg.SIZE / 2.0
+    step = cfg.SIZE / (cfg.RESOLUTION - 1)
+    return np.rint((x + half) / step).astype(np.intp), np.rint((y + half) / step).astype(np.intp)
+
+def rasterize_polylines(polylines, values=None):
+    """
+    Marks every grid cell crossed by the given (x, y, ...) polylines. If
+    `values` holds one list of per-point values per polyline, they are
+    linearly interpolated along each segment and the largest value landing
+    on each cell is returned too (0 elsewhere).
+    """
+    resolution = cfg.RESOLUTION
+    step = cfg.SIZE / (resolution - 1)
+    seeds = np.zeros((resolution, resolution), dtype=bool)
+    cell_values = np.zeros((resolution, resolution), dtype=np.float64)
+    for line_idx, points in enumerate(polylines):
+        for seg in range(len(points) - 1):
+            p0, p1 = points[seg], points[seg + 1]
+            n = max(1, int(math.ceil(math.hypot(p1[0] - p0[0], p1[1] - p0[1]) / (step * 0.5))))
+            t = np.linspace(0.0, 1.0, n + 1)
+            ix, iy = _grid_indices(p0[0] + (p1[0] - p0[0]) * t, p0[1] + (p1[1] - p0[1]) * t)
+            keep = (ix >= 0) & (ix < resolution) & (iy >= 0) & (iy < resolution)
+            seeds[iy[keep], ix[keep]] = True
+            if values is not None:
+                v0, v1 = values[line_idx][seg], values[line_idx][seg + 1]
+                np.maximum.at(cell_values, (iy[keep], ix[keep]), (v0 + (v1 - v0) * t)[keep])
+    if values is None:
+        return seeds
+    return seeds, cell_values
+
+def distance_field(polylines):
+    """World-unit distance from every grid vertex to the nearest polyline."""
+    seeds = rasterize_polylines(polylines)
+    if not seeds.any():
+        return np.full(seeds.shape, _EDT_INF, dtype=np.float32)
+    step = cfg.SIZE / (cfg.RESOLUTION - 1)
+    return (distance_transform(seeds) * step).astype(np.float32)
+
+def main_road_field(path):
+    """
+    Distance from every grid vertex to a main road, and the progress (0 at
+    the rim, 1 at the pit centre) of the road point nearest to it.
+    """
+    seeds, frac_cells = rasterize_polylines([path.points], [path.values])
+    if not seeds.any():
+        empty = np.zeros(seeds.shape, dtype=np.float32)
+        return empty + np.float32(_EDT_INF), empty
+    dist, nearest = distance_transform(seeds, return_nearest=True)
+    step = cfg.SIZE / (cfg.RESOLUTION - 1)
+    return (dist * step).astype(np.float32), frac_cells[nearest].astype(np.float32)
+
+def ramp_mask_field(paths):
+    """
+    Ramp flattening weight on the grid: at the ramp mouth (rim) it is 1 on
+    the centerline and falls linearly to 0 at the ramp's half-width, and the
+    whole profile fades to 0 towards the inner end of the ramp.
+    """
+    if not paths:
+        return np.zeros((cfg.RESOLUTION, cfg.RESOLUTION), dtype=np.float32)
+    along = [[1.0 - i / float(len(p.points) - 1) for i in range(len(p.points))] for p in paths]
+    seeds, along_cells = rasterize_polylines([p.points for p in paths], along)
+    _, width_cells = rasterize_polylines([p.points for p in paths], [p.values for p in paths])
+    dist, nearest = distance_transform(seeds, return_nearest=True)
+    dist *= cfg.SIZE / (cfg.RESOLUTION - 1)
+    half_width = np.maximum(width_cells[nearest], 1e-6)
+    mask = along_cells[nearest] * np.clip(1.0 - dist / half_width, 0.0, 1.0)
+    return mask.astype(np.float32)
+
+def get_distance_fields():
+    """
+    Returns the cached grid fields as a dict with:
+      "main": one field per pit, distance to that pit's main road
+      "main_progress": one field per pit, progress of the nearest main road point
+      "branch", "secondary": one ramp_mask_field per pit for each ramp kind
+      "roads": one field per pit, distance to any of that pit's road or ramp centerlines
+    """
+    global _FIELDS
+    if _FIELDS is None:
+        paths = get_paths()
+        pits = range(len(pit_generator.PIT_CENTERS))
+        main = [main_road_field(p) for p in paths if p.kind == "main"]
+        _FIELDS = {
+            "main": [dist for dist, _ in main],
+            "main_progress": [progress for _, progress in main],
+            "branch": [ramp_mask_field([p for p in paths if p.pit == i and p.kind == "branch"]) for i in pits],
+            "secondary": [ramp_mask_field([p for p in paths if p.pit == i and p.kind == "secondary"]) for i in pits],
+            "roads": [distance_field([p.points for p in paths if p.pit == i]) for i in pits],
+        }
+    return _FIELDS
+
+def sample_field(field, x, y):
+    """Bilinearly samples a grid field at a world position (clamped to the grid)."""
+    res = field.shape[0]
+    half = cfg.SIZE / 2.0
+    step = cfg.SIZE / (res - 1)
+    fx = max(0.0, min(res - 1.0, (x + half) / step))
+    fy = max(0.0, min(res - 1.0, (y + half) / step))
+    ix, iy = min(int(fx), res - 2), min(int(fy), res - 2)
+    tx, ty = fx - ix, fy - iy
+    d0 = utils.lerp(float(field[iy, ix]), float(field[iy, ix + 1]), tx)
+    d1 = utils.lerp(float(field[iy + 1, ix]), float(field[iy + 1, ix + 1]), tx)
+    return utils.lerp(d0, d1, ty)
+
+def main_road_distance(pit_idx, x, y):
+    """Distance from (x, y) to the main haul road centerline of a pit."""
+    return sample_field(get_distance_fields()["main"][pit_idx], x, y)
+
+def main_road_progress(pit_idx, x, y):
+    """Progress (0 at the rim, 1 at the centre) of the main road point nearest to (x, y)."""
+    return sample_field(get_distance_fields()["main_progress"][pit_idx], x, y)
+
+def road_distance(pit_idx, x, y):
+    """Distance from (x, y) to the nearest road or ramp centerline of a pit."""
+    return sample_field(get_distance_fields()["roads"][pit_idx], x, y)
+
+def ramp_mask(pit_idx, kind, x, y):
+    """Flattening weight in [0, 1] of a pit's "branch" or "secondary" ramps at (x, y)."""
+    return sample_field(get_distance_fields()[kind][pit_idx], x, y)
+
+# ---------------------- EXPORT ----------------------
+
+def centerlines_to_geojson(lines=None):
+    """Converts centerlines to a GeoJSON FeatureCollection of 3D LineStrings."""
+    lines = get_centerlines() if lines is None else lines
+    features = []
+    for l in lines:
+        length = sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(l.points, l.points[1:]))
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": [list(p) for p in l.points]},
+            "properties": {
+                "pit": l.pit,
+                "kind": l.kind,
+                "length": length,
+                "max_grade": max((abs(g) for g in l.grades), default=0.0),
+                "grades": l.grades,
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+def export_centerlines(path, lines=None):
+    """Writes the road and ramp centerlines to a GeoJSON file."""
+    with open(path, "w") as fh:
+        json.dump(centerlines_to_geojson(lines), fh)
+
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else "roads.geojson"
+    print(f"Seed: {cfg.NOISE_SEED}")
+    export_centerlines(out_path)
+    print(f"Wrote {len(get_centerlines())} centerlines to {out_path}")
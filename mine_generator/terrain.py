@@ -0,0 +1,157 @@
+# mine_generator/terrain.py
+"""
+Blender-independent terrain assembly: combines the pit, dump and plateau
+layers into a single heightfield, then applies erosion and edge blending.
+"""
+import math
+
+import numpy as np
+
+from . import config as cfg
+from . import utils
+from . import pit_generator
+from . import dump_generator
+from . import plateau_generator
+from . import road_network
+from . import heightfield
+
+# Feature mask bits, as written by generate_heightfield(features=...)
+FEATURE_PIT = 1
+FEATURE_DUMP = 2
+FEATURE_PLATEAU = 4
+FEATURE_ROAD = 8
+
+# A dump/plateau vertex must rise this far above the base surface to count as that feature
+FEATURE_MIN_HEIGHT = 0.25
+
+# FBM sample spacings of the base and edge-blend surfaces on the current grid
+_BASE_SURFACE_SPACING = utils.sample_spacing(0.0038)
+_EDGE_SURFACE_SPACING = utils.sample_spacing(0.0035)
+
+def _layers_at(x, y):
+    """compute_layers_at plus the index of the pit that produced pit_z (None without pits)."""
+    # --- Negative feature: Pit depth (should be negative) ---
+    pit_z, pit_idx = pit_generator.compute_pit_depth_and_index(x, y)
+
+    # Gentle base terrain to elevate dumps and plateaus
+    base_surface = utils.fbm(x * 0.0038, y * 0.0038, cfg.NOISE_SEED + 21, octaves=4,
+                             spacing=_BASE_SURFACE_SPACING) * 1.6 * cfg.VERTICAL_SCALE
+
+    # --- Positive features: Dumps and Plateaus ---
+    dump_h = dump_generator.compute_dump_height_at(x, y)
+    plateau_h = plateau_generator.compute_plateau_height_at(x, y)
+
+    return (pit_z, dump_h, plateau_h, base_surface), pit_idx
+
+def compute_layers_at(x, y):
+    """Evaluates the pit, dump and plateau layers at a point (dump/plateau may be None)."""
+    return _layers_at(x, y)[0]
+
+def _combine_layers(pit_z, dump_h, plateau_h, base_surface):
+    """Final elevation is the highest layer; dumps and plateaus sit on the base surface."""
+    z = pit_z
+    if dump_h is not None:
+        z = max(z, base_surface + dump_h)
+    if plateau_h is not None:
+        z = max(z, base_surface + plateau_h)
+    return z
+
+def compute_height_at(x, y):
+    """Analytic (pre-erosion) elevation at a point: the highest of all layers."""
+    return _combine_layers(*compute_layers_at(x, y))
+
+def compute_height_and_features_at(x, y):
+    """
+    Analytic elevation plus the FEATURE_* bits of the layer that produced it.
+    Pit vertices also get FEATURE_ROAD within half a road width of a road or
+    ramp centerline of the pit that produced them.
+    """
+    (pit_z, dump_h, plateau_h, base_surface), pit_idx = _layers_at(x, y)
+    z = _combine_layers(pit_z, dump_h, plateau_h, base_surface)
+    features = 0
+    if dump_h is not None and dump_h > FEATURE_MIN_HEIGHT and base_surface + dump_h == z:
+        features |= FEATURE_DUMP
+    if plateau_h is not None and plateau_h > FEATURE_MIN_HEIGHT and base_surface + plateau_h == z:
+        features |= FEATURE_PLATEAU
+    if not features and pit_z == z and pit_generator.is_inside_pit(x, y):
+        features |= FEATURE_PIT
+        if road_network.road_distance(pit_idx, x, y) <= cfg.ROAD_WIDTH * 0.5:
+            features |= FEATURE_ROAD
+    return z, features
+
+def edge_blend_at(x, y, z):
+    """Blends an elevation towards the surrounding ground surface outside the pit rim."""
+    r, theta = math.hypot(x, y), math.atan2(y, x)
+    eff_r = pit_generator.compute_effective_radius(theta)
+
+    if r > eff_r * 0.98:
+        surf = utils.fbm(x * 0.0035, y * 0.0035, cfg.NOISE_SEED + 21, octaves=4,
+                         spacing=_EDGE_SURFACE_SPACING) * 1.6
+        blend_t = utils.smoothstep((r - eff_r * 0.98) / max(1.0, cfg.SIZE * 0.08))
+        return utils.lerp(z, surf * cfg.VERTICAL_SCALE, blend_t)
+    return z
+
+def apply_erosion(hf):
+    """Applies a simple hydraulic erosion simulation to a HeightField, in place."""
+    z = hf.z
+    inner = z[1:-1, 1:-1]
+    rows, cols = z.shape
+    neighbours = [z[1 + dy:rows - 1 + dy, 1 + dx:cols - 1 + dx]
+                  for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]]
+
+    # Scratch buffers are reused across iterations; every neighbour average is
+    # computed before the interior is overwritten, so the update stays Jacobi.
+    delta = np.empty_like(inner)
+    falloff = np.empty_like(inner)
+    for _ in range(cfg.EROSION_ITERATIONS):
+        np.copyto(delta, neighbours[0])
+        for n in neighbours[1:]:
+            delta += n
+        delta *= 1.0 / len(neighbours)
+        delta -= inner
+        np.abs(delta, out=falloff)
+        falloff *= 6.0
+        falloff += 1.0
+        delta *= cfg.EROSION_RATE
+        delta /= falloff
+        inner += delta
+    return hf
+
+def apply_edge_blend(hf):
+    """Blends the outer terrain towards the ground surface, in place."""
+    coords = hf.coords().tolist()
+    for row, y in enumerate(coords):
+        z_row = hf.z[row]
+        z_row[:] = [edge_blend_at(x, y, z) for x, z in zip(coords, z_row.tolist())]
+    return hf
+
+def generate_heightfield(verbose=True, features=None):
+    """
+    Runs the full elevation pipeline over the grid and returns a HeightField.
+    If `features` is a (RESOLUTION, RESOLUTION) uint8 array it is filled with
+    FEATURE_* bits describing which layer produced each (pre-erosion) vertex,
+    as in compute_height_and_features_at.
+    """
+    hf = heightfield.HeightField(settings=cfg.settings())
+    coords = hf.coords().tolist()
+
+    if verbose:
+        print("Calculating terrain elevations...")
+    if features is None:
+        for row, y in enumerate(coords):
+            hf.z[row] = [compute_height_at(x, y) for x in coords]
+    else:
+        for row, y in enumerate(coords):
+            samples = [compute_height_and_features_at(x, y) for x in coords]
+            hf.z[row] = [z for z, _ in samples]
+            features[row] = [f for _, f in samples]
+
+    if verbose:
+        print("Applying erosion...")
+    apply_erosion(hf)
+
+    if verbose:
+        print("Blending outer edges...")
+    apply_edge_blend(hf)
+
+    return hf
@@ -4,21 +4,58 @@ General-purpose utility functions for math and noise generation.
 """
 from mathutils import Vector, noise
 
+from . import config as cfg
+
 def perlin3(x, y, z):
     """3D Perlin noise lookup."""
     return noise.noise(Vector((x, y, z)))
 
-def fbm(x, y, seed, octaves=4, lacunarity=2.0, gain=0.5):
-    """Fractional Brownian Motion (FBM) noise function."""
+def fbm(x, y, seed, octaves=4, lacunarity=2.0, gain=0.5, spacing=None):
+    """
+    Fractional Brownian Motion (FBM) noise function.
+
+    If `spacing` (the distance between neighbouring samples, in noise
+    coordinates) is given, the sum is band-limited: octaves up to the
+    sampling Nyquist frequency are kept unchanged, an octave between Nyquist
+    and one lacunarity step above it is faded out, and higher octaves are
+    skipped instead of aliasing.
+    """
     value = 0.0
     freq = 1.0
     amp = 1.0
+    nyquist = 0.5 / spacing if spacing else None
     for _ in range(octaves):
-        value += amp * perlin3(x * freq, y * freq, seed)
+        # The fade band starts at Nyquist rather than ending there: octaves at
+        # or below Nyquist stay untouched, so every sum already resolved by
+        # the grid (all of them at the default RESOLUTION) is bit-identical to
+        # the unlimited one. The price is that a partly faded octave up to
+        # lacunarity * Nyquist can still alias, at reduced amplitude.
+        if nyquist is not None and freq > nyquist:
+            weight = smoothstep((nyquist * lacunarity - freq) / (nyquist * lacunarity - nyquist))
+            if weight <= 0.0:
+                break
+            value += amp * weight * perlin3(x * freq, y * freq, seed)
+        else:
+            value += amp * perlin3(x * freq, y * freq, seed)
         freq *= lacunarity
         amp *= gain
     return value
 
+def sample_spacing(scale, radius=None):
+    """
+    Noise-space distance between neighbouring grid vertices for an FBM call
+    whose coordinates are world position * `scale`. For angular lookups
+    (cos(theta) * scale, ...) pass the radius at which they are sampled.
+    Returns None (full band) when NOISE_BAND_LIMIT is off. Depends only on
+    the grid, so callers compute it once at import time.
+    """
+    if not cfg.NOISE_BAND_LIMIT:
+        return None
+    step = cfg.SIZE / (cfg.RESOLUTION - 1)
+    if radius is None:
+        return scale * step
+    return scale * step / max(radius, step)
+
 def smoothstep(t):
     """A smooth interpolation function."""
     t = max(0.0, min(1.0, t))
@@ -2,7 +2,6 @@ import bpy
 import sys
 import os
 import importlib
-import math  # Needed for terrain blending and polar coordinates
 
 # --- Robust Path and Module Reloading ---
 
@@ -48,71 +47,17 @@ except (Exception, FileNotFoundError) as e:
 else:
     # --- Import Generator Modules ---
     from mine_generator import config as cfg
-    from mine_generator import utils
     from mine_generator import pit_generator
-    from mine_generator import dump_generator
     from mine_generator import mesh_builder
-    from mine_generator import plateau_generator
+    from mine_generator import terrain
 
 
 def generate_terrain_data():
     """
     Orchestrates the data generation process by combining pit and dump calculations.
-    Returns the final vertex and face data for mesh creation.
+    Returns the final HeightField for mesh creation.
     """
-    verts, faces = mesh_builder.make_grid()
-    z_grid = [0.0] * len(verts)
-
-    print("Calculating terrain elevations...")
-    for i, v in enumerate(verts):
-        x, y = v[0], v[1]
-
-        # --- Negative feature: Pit depth (should be negative) ---
-        pit_z = pit_generator.compute_pit_depth(x, y)
-
-        # --- Positive features: Dumps and Plateaus ---
-        positive_features = []
-
-        # Gentle base terrain to elevate dumps and plateaus
-        base_surface = utils.fbm(x * 0.0038, y * 0.0038, cfg.NOISE_SEED + 21, octaves=4) * 1.6 * cfg.VERTICAL_SCALE
-
-        # Add dump height (if any)
-        dump_h = dump_generator.compute_dump_height_at(x, y)
-        if dump_h is not None:
-            positive_features.append(base_surface + dump_h)
-
-        # Add plateau height (if any)
-        plateau_h = plateau_generator.compute_plateau_height_at(x, y)
-        if plateau_h is not None:
-            positive_features.append(base_surface + plateau_h)
-
-        # --- Final elevation ---
-        if positive_features:
-            final_z = max(pit_z, *positive_features)
-        else:
-            final_z = pit_z
-
-        z_grid[i] = final_z
-
-    print("Applying erosion...")
-    z_grid = mesh_builder.apply_erosion(z_grid)
-
-    print("Blending outer edges...")
-    for i, v in enumerate(verts):
-        x, y = v[0], v[1]
-        r, theta = math.hypot(x, y), math.atan2(y, x)
-        eff_r = pit_generator.compute_effective_radius(theta)
-
-        if r > eff_r * 0.98:
-            surf = utils.fbm(x * 0.0035, y * 0.0035, cfg.NOISE_SEED + 21, octaves=4) * 1.6
-            blend_t = utils.smoothstep((r - eff_r * 0.98) / max(1.0, cfg.SIZE * 0.08))
-            z_grid[i] = utils.lerp(z_grid[i], surf * cfg.VERTICAL_SCALE, blend_t)
-
-    # Apply Z to verts
-    for i, v in enumerate(verts):
-        v[2] = z_grid[i]
-
-    return verts, faces
+    return terrain.generate_heightfield()
 
 
 def main():
@@ -125,14 +70,14 @@ def main():
 
     mesh_builder.clear_scene()
 
-    verts, faces = generate_terrain_data()
+    hf = generate_terrain_data()
 
     print("Building Blender mesh object...")
-    obj = mesh_builder.build_mesh_object("OpenPit_WithDumps", verts, faces)
+    obj = mesh_builder.build_mesh_object("OpenPit_WithDumps", hf)
 
     if cfg.APPLY_VERTEX_COLORS:
         print("Applying vertex colors...")
-        mesh_builder.add_vertex_colors(obj)
+        mesh_builder.add_vertex_colors(obj, hf)
 
     print("Finalizing mesh...")
     mesh_builder.final_mesh_cleanup(obj)
@@ -0,0 +1,21 @@
+import importlib
+
+import pytest
+
+from mine_generator import config as cfg
+
+
+def _configure(seed, **overrides):
+    # Generator modules derive seed- and grid-dependent state at import time
+    from mine_generator import pit_generator, road_network, dump_generator, plateau_generator, terrain
+    cfg.configure(seed, **overrides)
+    for module in (pit_generator, road_network, dump_generator, plateau_generator, terrain):
+        importlib.reload(module)
+
+
+@pytest.fixture(scope="module")
+def configure_generator():
+    """Returns configure(seed, **overrides); the previous configuration is restored afterwards."""
+    saved = cfg.settings()
+    yield _configure
+    _configure(saved.pop("NOISE_SEED"), **saved)
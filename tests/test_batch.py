@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mathutils")
+
+from mine_generator import batch
+from mine_generator import terrain
+
+RES = 16
+SEEDS = [3, 4]
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    out_dir = str(tmp_path_factory.mktemp("dataset"))
+    batch.run(out_dir, SEEDS, fixed={"RESOLUTION": RES}, shard_size=1, workers=1)
+    return out_dir
+
+
+def _mtimes(out_dir):
+    return {name: os.stat(os.path.join(out_dir, name)).st_mtime_ns
+            for name in os.listdir(out_dir) if name.startswith("shard_")}
+
+
+def test_shards_hold_each_scenario(dataset, configure_generator):
+    records = batch._load_index(dataset)
+    assert sorted(records) == [0, 1]
+    for idx, seed in enumerate(SEEDS):
+        with np.load(batch._shard_path(dataset, idx)) as data:
+            assert data["ids"].tolist() == [idx]
+            assert data["heights"].shape == (1, RES, RES) and data["heights"].dtype == np.float32
+            assert data["masks"].shape == (1, RES, RES) and data["masks"].dtype == np.uint8
+            heights, masks = data["heights"][0], data["masks"][0]
+
+        configure_generator(seed, RESOLUTION=RES)
+        features = np.zeros((RES, RES), dtype=np.uint8)
+        hf = terrain.generate_heightfield(verbose=False, features=features)
+        assert np.array_equal(heights, hf.z)
+        assert np.array_equal(masks, features)
+        assert records[idx]["seed"] == seed
+        assert (records[idx]["shard"], records[idx]["offset"]) == (idx, 0)
+        assert records[idx]["z_min"] == pytest.approx(float(hf.z.min()))
+
+
+def test_resume_regenerates_only_missing_shard(dataset, capsys):
+    before = _mtimes(dataset)
+    os.remove(batch._shard_path(dataset, 1))
+    capsys.readouterr()
+    batch.run(dataset, SEEDS, fixed={"RESOLUTION": RES}, shard_size=1, workers=1)
+    assert "1 already done, 1 to generate in 1 shards" in capsys.readouterr().out
+
+    after = _mtimes(dataset)
+    assert sorted(after) == sorted(before)
+    assert after["shard_00000.npz"] == before["shard_00000.npz"]
+    with np.load(batch._shard_path(dataset, 1)) as data:
+        assert data["ids"].tolist() == [1]
+
+
+def test_load_index_ignores_torn_last_line(dataset):
+    with open(os.path.join(dataset, batch.INDEX_NAME), "a") as fh:
+        fh.write('{"id": 7, "seed": ')
+    assert sorted(batch._load_index(dataset)) == [0, 1]
+
+
+def test_resume_rejects_a_different_run(dataset):
+    with pytest.raises(SystemExit):
+        batch.run(dataset, SEEDS, fixed={"RESOLUTION": RES}, shard_size=2, workers=1)
+    with open(os.path.join(dataset, batch.MANIFEST_NAME)) as fh:
+        assert json.load(fh)["shard_size"] == 1
+
+
+@pytest.mark.parametrize("sweeps, fixed", [
+    ({}, {"NOT_A_PARAMETER": 1}),
+    ({"NOISE_SEED": [1, 2]}, {}),
+    ({"RESOLUTION": [16, 32]}, {}),
+])
+def test_run_rejects_bad_parameters_before_writing(tmp_path, sweeps, fixed):
+    out_dir = str(tmp_path / "out")
+    with pytest.raises(ValueError):
+        batch.run(out_dir, SEEDS, sweeps=sweeps, fixed=fixed)
+    assert not os.path.exists(out_dir)
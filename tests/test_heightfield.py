@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mine_generator import config as cfg
+from mine_generator import heightfield
+
+
+def test_save_load_round_trip(tmp_path):
+    z = np.arange(16, dtype=np.float32).reshape(4, 4)
+    hf = heightfield.HeightField(4, 12.0, z, settings=cfg.settings())
+    path = str(tmp_path / "terrain.npz")
+    hf.save(path)
+
+    loaded = heightfield.HeightField.load(path)
+    assert loaded.resolution == 4 and loaded.size == 12.0
+    assert np.array_equal(loaded.z, z)
+    assert loaded.settings == cfg.settings()
+    assert loaded.settings["NOISE_SEED"] == cfg.NOISE_SEED
+
+
+def test_settings_restore_configuration():
+    saved = cfg.settings()
+    try:
+        restore = dict(saved)
+        cfg.configure(saved["NOISE_SEED"] + 1, MAX_DEPTH=saved["MAX_DEPTH"] + 5.0)
+        assert cfg.settings() != saved
+        cfg.configure(restore.pop("NOISE_SEED"), **restore)
+        assert cfg.settings() == saved
+    finally:
+        restore = dict(saved)
+        cfg.configure(restore.pop("NOISE_SEED"), **restore)
+
+
+def _make_grid_faces(res):
+    # Face order of the former list-based mesh_builder.make_grid
+    faces = []
+    for v_y in range(res - 1):
+        for v_x in range(res - 1):
+            i = v_y * res + v_x
+            faces.append((i, i + 1, i + res + 1, i + res))
+    return faces
+
+
+@pytest.mark.parametrize("res", [2, 3, 7])
+def test_face_indices_match_make_grid_order(res):
+    hf = heightfield.HeightField(res, 10.0)
+    faces = hf.face_indices()
+    assert faces.shape == (hf.face_count, 4)
+    assert faces.tolist() == [list(f) for f in _make_grid_faces(res)]
+
+
+def test_vertex_coords_are_row_major():
+    hf = heightfield.HeightField(3, 4.0, np.arange(9, dtype=np.float32).reshape(3, 3))
+    co = hf.vertex_coords().reshape(-1, 3)
+    assert co[1].tolist() == [0.0, -2.0, 1.0]
+    assert co[3].tolist() == [-2.0, 0.0, 3.0]
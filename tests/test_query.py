@@ -0,0 +1,105 @@
+import io
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mathutils")
+
+from mine_generator import heightfield
+from mine_generator import query
+
+RES = 6
+SIZE = 10.0
+STEP = SIZE / (RES - 1)
+
+
+@pytest.fixture
+def grid():
+    z = np.random.default_rng(1).random((RES, RES)).astype(np.float32) * 10.0
+    hf = heightfield.HeightField(RES, SIZE, z)
+    query.set_heightfield(hf)
+    yield hf
+    query.clear_cache()
+
+
+def test_raster_reproduces_vertices_and_midpoints(grid):
+    xs = grid.coords()
+    pts = [(x, y) for y in xs for x in xs]
+    assert np.allclose(query.sample_raster(pts).z, grid.z.ravel())
+
+    mid = query.sample_raster([(xs[1] + STEP / 2, xs[2]), (xs[3], xs[4] + STEP / 2)]).z
+    assert mid[0] == pytest.approx((grid.z[2, 1] + grid.z[2, 2]) / 2.0, rel=1e-6)
+    assert mid[1] == pytest.approx((grid.z[4, 3] + grid.z[5, 3]) / 2.0, rel=1e-6)
+
+
+def test_raster_gradient_and_normals(grid):
+    h = 1e-4
+    pts = np.array([(-3.3, 1.7), (0.4, -2.2), (2.9, 3.1)])
+    res = query.sample_raster(pts)
+    fd_x = (query.sample_raster(pts + [h, 0.0]).z - query.sample_raster(pts - [h, 0.0]).z) / (2 * h)
+    fd_y = (query.sample_raster(pts + [0.0, h]).z - query.sample_raster(pts - [0.0, h]).z) / (2 * h)
+    assert np.allclose(res.gradient, np.stack((fd_x, fd_y), axis=1), atol=1e-3)
+    assert np.allclose(np.linalg.norm(res.normal, axis=1), 1.0)
+    assert (res.normal[:, 2] > 0).all()
+
+
+def test_raster_clamps_points_outside_the_grid(grid):
+    half = SIZE / 2.0
+    outside = query.sample_raster([(-half - 50.0, -half - 50.0), (half + 3.0, 0.0)]).z
+    border = query.sample_raster([(-half, -half), (half, 0.0)]).z
+    assert np.array_equal(outside, border)
+
+
+def _serve(data):
+    out = io.BytesIO()
+    query._serve_stream(io.BytesIO(data), out)
+    out.seek(0)
+    return out
+
+
+def test_server_answers_json_requests(grid):
+    out = _serve(b'{"points": [[0, 0], [1.5, -2.0]]}\n{"points": [[0, 0]], "gradients": false}\n')
+    first = json.loads(out.readline())
+    expected = query.sample_raster([(0, 0), (1.5, -2.0)])
+    assert first["z"] == pytest.approx(expected.z.tolist())
+    assert np.allclose(first["normal"], expected.normal)
+    # Raster mode always returns gradients
+    assert "gradient" in json.loads(out.readline())
+
+
+def test_server_answers_binary_requests(grid):
+    pts = np.array([[0.0, 0.0], [1.5, -2.0], [4.0, 4.0]])
+    out = _serve(b'{"count": 3}\n' + pts.astype("<f8").tobytes())
+    header = json.loads(out.readline())
+    assert header == {"count": 3, "fields": ["z", "gradient", "normal"]}
+    payload = np.frombuffer(out.read(), dtype="<f8")
+    assert payload.size == 3 + 6 + 9
+    expected = query.sample_raster(pts)
+    assert np.allclose(payload[:3], expected.z)
+    assert np.allclose(payload[3:9].reshape(3, 2), expected.gradient)
+    assert np.allclose(payload[9:].reshape(3, 3), expected.normal)
+
+
+def test_server_survives_malformed_requests(grid):
+    requests = [
+        b"[1, 2]\n",
+        b"not json\n",
+        b'{"count": -1}\n',
+        b'{"count": 1.5}\n',
+        b'{"points": [[NaN, 0]]}\n',
+        b'{"points": [[1e308, 1e309]]}\n',
+        b'{"points": [1, 2, 3]}\n',
+        b'{"mode": "fast", "points": [[0, 0]]}\n',
+        b'{"points": [[0, 0]]}\n',
+    ]
+    lines = _serve(b"".join(requests)).read().splitlines()
+    assert len(lines) == len(requests)
+    for line in lines[:-1]:
+        assert "error" in json.loads(line)
+    assert json.loads(lines[-1])["z"] == pytest.approx([query.sample_raster([(0, 0)]).z[0]])
+
+
+def test_server_stops_on_truncated_binary_payload(grid):
+    out = _serve(b'{"count": 2}\n' + b"\x00" * 8)
+    assert out.read() == b""
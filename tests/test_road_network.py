@@ -0,0 +1,101 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mathutils")
+
+from mine_generator import config as cfg
+from mine_generator import pit_generator
+from mine_generator import road_network
+
+
+@pytest.fixture(scope="module")
+def network(configure_generator):
+    configure_generator(7, RESOLUTION=100)
+    return road_network
+
+
+def _brute_force_edt(seeds):
+    pts = np.argwhere(seeds)
+    rows, cols = np.mgrid[:seeds.shape[0], :seeds.shape[1]]
+    d2 = (rows[..., np.newaxis] - pts[:, 0]) ** 2 + (cols[..., np.newaxis] - pts[:, 1]) ** 2
+    return np.sqrt(d2.min(axis=-1))
+
+
+@pytest.mark.parametrize("density", [0.01, 0.05, 0.3])
+def test_distance_transform_matches_brute_force(density):
+    rng = np.random.default_rng(int(density * 100))
+    seeds = rng.random((19, 27)) < density
+    seeds[3, 5] = True
+    dist, (near_r, near_c) = road_network.distance_transform(seeds, return_nearest=True)
+    expected = _brute_force_edt(seeds)
+    assert np.allclose(dist, expected)
+    assert seeds[near_r, near_c].all()
+    rows, cols = np.mgrid[:seeds.shape[0], :seeds.shape[1]]
+    assert np.allclose(np.hypot(rows - near_r, cols - near_c), expected)
+
+
+def _segment_distance(px, py, points):
+    pts = np.asarray(points, dtype=np.float64)
+    p0, d = pts[:-1], np.diff(pts, axis=0)
+    t = ((px - p0[:, 0]) * d[:, 0] + (py - p0[:, 1]) * d[:, 1]) / np.maximum((d * d).sum(axis=1), 1e-12)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (p0[:, 0] + t * d[:, 0]), py - (p0[:, 1] + t * d[:, 1])).min()
+
+
+def test_main_road_field_matches_centerline_distance(network):
+    field = network.get_distance_fields()["main"][0]
+    road = [p for p in network.get_paths() if p.pit == 0 and p.kind == "main"][0]
+    step = cfg.SIZE / (cfg.RESOLUTION - 1)
+    half = cfg.SIZE / 2.0
+    # Rasterizing to the nearest vertex moves the centerline by at most half a cell diagonal
+    tolerance = step * math.sqrt(0.5) + 1e-6
+    for row in range(0, cfg.RESOLUTION, 3):
+        for col in range(0, cfg.RESOLUTION, 3):
+            x, y = -half + col * step, -half + row * step
+            assert abs(field[row, col] - _segment_distance(x, y, road.points)) <= tolerance
+
+
+def test_main_road_band_is_narrow(network):
+    # Regression guard: the flattened band is half a road width each side of the
+    # centerline, so it must not swallow the pit between spiral turns.
+    cx, cy, size_scale, _ = pit_generator.PIT_CENTERS[0]
+    eff = pit_generator.compute_effective_radius(0.0, size_scale)
+    ring = [(cx + r * math.cos(a), cy + r * math.sin(a))
+            for r in np.linspace(eff * 0.2, eff * 0.9, 12) for a in np.linspace(-math.pi, math.pi, 90)]
+    inside = [network.main_road_distance(0, x, y) <= cfg.ROAD_WIDTH * 0.5 for x, y in ring]
+    spacing = eff / cfg.ROAD_SPIRAL_TURNS
+    assert sum(inside) / float(len(inside)) < min(1.0, cfg.ROAD_WIDTH / spacing) + 0.15
+
+
+def test_ramp_masks_are_bounded_and_local(network):
+    fields = network.get_distance_fields()
+    coords = -cfg.SIZE / 2.0 + np.arange(cfg.RESOLUTION) * (cfg.SIZE / (cfg.RESOLUTION - 1))
+    in_pit = np.array([[pit_generator.is_inside_pit(x, y) for x in coords] for y in coords])
+    for kind in ("branch", "secondary"):
+        mask = fields[kind][0]
+        assert mask.min() >= 0.0 and mask.max() <= 1.0
+        for path in network.get_paths():
+            if path.pit == 0 and path.kind == kind:
+                assert network.ramp_mask(0, kind, *path.points[0]) > 0.5
+        assert np.count_nonzero(mask[in_pit]) < np.count_nonzero(in_pit) * 0.6
+
+
+def test_main_road_has_a_drivable_grade(network):
+    lines = [l for l in network.get_centerlines() if l.kind == "main"]
+    assert lines
+    for line in lines:
+        assert line.points[-1][2] < line.points[0][2]
+        grades = np.abs(line.grades)
+        # Bench cliffs used to show up as grades well above 1
+        assert np.percentile(grades, 95) <= 0.05
+        assert grades.max() <= 0.25
+
+
+def test_main_road_descends_from_rim_to_bottom_pad(network):
+    road = [p for p in network.get_paths() if p.pit == 0 and p.kind == "main"][0]
+    cx, cy, size_scale, _ = pit_generator.PIT_CENTERS[0]
+    assert math.hypot(road.points[-1][0] - cx, road.points[-1][1] - cy) == pytest.approx(
+        cfg.BOTTOM_PAD_RADIUS * size_scale, rel=0.3)
+    assert all(b > a for a, b in zip(road.values, road.values[1:]))
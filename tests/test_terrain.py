@@ -0,0 +1,49 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mathutils")
+
+from mine_generator import config as cfg
+from mine_generator import heightfield
+from mine_generator import terrain
+
+
+def _reference_erosion(z_grid, width, iterations, rate):
+    # The former list-based Jacobi loop from mesh_builder.apply_erosion
+    offsets = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+    for _ in range(iterations):
+        new_grid = list(z_grid)
+        for y in range(1, width - 1):
+            for x in range(1, width - 1):
+                i = y * width + x
+                zc = z_grid[i]
+                neigh_avg = sum(z_grid[(y + dy) * width + (x + dx)] for dx, dy in offsets) / len(offsets)
+                falloff = 1.0 / (1.0 + abs(neigh_avg - zc) * 6.0)
+                new_grid[i] = zc + (neigh_avg - zc) * rate * falloff
+        z_grid = new_grid
+    return z_grid
+
+
+def test_apply_erosion_matches_reference_loop():
+    res = 12
+    rng = np.random.default_rng(3)
+    z = (rng.random((res, res)) * 20.0 - 10.0).astype(np.float32)
+    expected = _reference_erosion(z.ravel().astype(np.float64).tolist(), res,
+                                  cfg.EROSION_ITERATIONS, cfg.EROSION_RATE)
+
+    hf = heightfield.HeightField(res, 50.0, z)
+    terrain.apply_erosion(hf)
+    assert np.allclose(hf.z.ravel(), expected, atol=5e-5)
+    # The border is left untouched
+    assert np.array_equal(hf.z[0], z[0]) and np.array_equal(hf.z[:, -1], z[:, -1])
+
+
+def test_road_bits_only_mark_pit_vertices(configure_generator):
+    # Seed 5 piles dumps and plateaus over several road centerlines
+    configure_generator(5, RESOLUTION=60)
+    features = np.zeros((cfg.RESOLUTION, cfg.RESOLUTION), dtype=np.uint8)
+    terrain.generate_heightfield(verbose=False, features=features)
+    road = (features & terrain.FEATURE_ROAD) != 0
+    assert road.any()
+    assert not (features[road] & (terrain.FEATURE_DUMP | terrain.FEATURE_PLATEAU)).any()
+    assert (features[road] & terrain.FEATURE_PIT).all()
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("mathutils")
+
+from mine_generator import utils
+
+POINTS = [(0.0, 0.0), (0.37, -1.21), (12.5, 3.75), (-40.2, 18.9)]
+
+
+def _reference_fbm(x, y, seed, octaves=4, lacunarity=2.0, gain=0.5):
+    # The original, unlimited octave sum
+    value = 0.0
+    freq = 1.0
+    amp = 1.0
+    for _ in range(octaves):
+        value += amp * utils.perlin3(x * freq, y * freq, seed)
+        freq *= lacunarity
+        amp *= gain
+    return value
+
+
+@pytest.mark.parametrize("octaves", [1, 2, 4])
+def test_fbm_without_spacing_matches_reference(octaves):
+    for x, y in POINTS:
+        assert utils.fbm(x, y, 11, octaves=octaves) == _reference_fbm(x, y, 11, octaves=octaves)
+
+
+def test_fbm_is_unchanged_below_nyquist():
+    # Highest octave frequency 8 sits exactly at Nyquist for spacing 1/16
+    for x, y in POINTS:
+        assert utils.fbm(x, y, 5, octaves=4, spacing=1.0 / 16) == _reference_fbm(x, y, 5, octaves=4)
+
+
+def test_fbm_fades_octaves_above_nyquist():
+    for x, y in POINTS:
+        # Nyquist 1: the second octave (frequency 2) is fully faded out
+        assert utils.fbm(x, y, 5, octaves=4, spacing=0.5) == _reference_fbm(x, y, 5, octaves=1)
+    # Nyquist 0.5: nothing is resolvable
+    assert utils.fbm(0.37, -1.21, 5, octaves=4, spacing=1.0) == 0.0
+
+
+def test_fbm_partially_weights_the_octave_above_nyquist():
+    # Nyquist 1.5: frequency 2 lies a third of the way into the fade band
+    weight = utils.smoothstep((3.0 - 2.0) / (3.0 - 1.5))
+    assert 0.0 < weight < 1.0
+    for x, y in POINTS:
+        expected = utils.perlin3(x, y, 5) + 0.5 * weight * utils.perlin3(x * 2.0, y * 2.0, 5)
+        assert utils.fbm(x, y, 5, octaves=4, spacing=1.0 / 3) == pytest.approx(expected, rel=1e-12, abs=1e-15)